@@ -0,0 +1,90 @@
+"""
+band_features.py
+
+Maps multi-channel band-power streams to bands and reduces them to one feature
+value per player, used by game.py. Single-channel streams are taken as an
+already-reduced value and used as-is.
+"""
+
+import re
+
+import numpy as np
+
+
+# Feature computed from multi-channel band-power streams (see FEATURES below)
+FEATURE = "theta_beta"
+
+# Band order used when a multi-channel stream has no channel labels:
+# channels are assumed interleaved per electrode, e.g. TP9_theta, TP9_alpha, TP9_beta, AF7_theta, ...
+BAND_ORDER = ("theta", "alpha", "beta")
+
+_EPS = 1e-12
+
+# Each feature maps {band: (players, electrodes) array} -> (players,) array.
+# Lower is "more relaxed" for every feature, matching the original theta/beta rule.
+FEATURES = {
+    "theta_beta": lambda b: b["theta"].mean(axis=-1) / np.maximum(b["beta"].mean(axis=-1), _EPS),
+    "theta_alpha": lambda b: b["theta"].mean(axis=-1) / np.maximum(b["alpha"].mean(axis=-1), _EPS),
+    "beta_alpha": lambda b: b["beta"].mean(axis=-1) / np.maximum(b["alpha"].mean(axis=-1), _EPS),
+}
+
+# Bands each feature needs from the stream
+FEATURE_BANDS = {
+    "theta_beta": ("theta", "beta"),
+    "theta_alpha": ("theta", "alpha"),
+    "beta_alpha": ("beta", "alpha"),
+}
+
+
+def _channel_labels(stream_info, n):
+    labels = []
+    ch = stream_info.desc().child("channels").child("channel")
+    while not ch.empty() and len(labels) < n:
+        labels.append(ch.child_value("label").lower())
+        ch = ch.next_sibling()
+    return labels
+
+
+def band_layout(stream_info, feature=FEATURE):
+    """
+    Return {band: channel index array} for a multi-channel band-power stream,
+    or None for a single-channel stream.
+
+    When the stream has channel labels they are trusted: a channel belongs to
+    the band named by one of its label tokens (e.g. "TP9_theta", "AF7-beta"),
+    and only the bands `feature` needs are required. Streams without labels
+    are assumed interleaved in BAND_ORDER per electrode.
+    Raises ValueError if the needed bands can't be found.
+    """
+    n = stream_info.channel_count()
+    if n <= 1:
+        return None
+
+    labels = _channel_labels(stream_info, n)
+    if any(labels):
+        layout = {}
+        for i, label in enumerate(labels):
+            bands = set(re.split(r"[^a-z0-9]+", label)) & set(BAND_ORDER)
+            if len(bands) > 1:
+                raise ValueError(f"channel label '{label}' names more than one band")
+            for band in bands:
+                layout.setdefault(band, []).append(i)
+        missing = [band for band in FEATURE_BANDS[feature] if band not in layout]
+        if missing:
+            raise ValueError(f"labelled channels have no {', '.join(missing)} band needed by '{feature}'")
+        return {band: np.array(idx) for band, idx in layout.items()}
+
+    if n % len(BAND_ORDER):
+        raise ValueError(f"{n} unlabelled channels can't be split into bands {BAND_ORDER}")
+    return {band: np.arange(i, n, len(BAND_ORDER)) for i, band in enumerate(BAND_ORDER)}
+
+
+def reduce_features(samples, layout, feature=FEATURE):
+    """
+    Reduce a (players, channels) array to one value per player in a single
+    vectorized pass. With layout=None the first channel is returned as-is.
+    """
+    samples = np.asarray(samples, dtype=np.float64)
+    if layout is None:
+        return samples[:, 0]
+    return FEATURES[feature]({band: samples[:, idx] for band, idx in layout.items()})
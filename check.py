@@ -1,14 +1,277 @@
+#!/usr/bin/env python3
+"""
+check.py
+
+List or inspect the LSL streams visible on the network.
+
+Without arguments this prints name / type / source_id for every stream, as
+before. With --watch it attaches an inlet to every stream (or only the ones
+matching --name / --type / --source-id) and keeps a live health table:
+
+  rate      effective sample rate over the last WINDOW_SEC vs nominal_srate
+  gaps      inter-sample intervals longer than GAP_FACTOR nominal periods
+  jitter    std-dev of inter-sample intervals (ms)
+  offset    clock offset reported by time_correction() (ms)
+  kB/s      payload throughput
+  state     OK / STALLED (nothing received for DROPOUT_SEC) / WAIT
+
+All inlets are serviced from a single thread with non-blocking chunked pulls,
+and new streams are picked up by a background ContinuousResolver, so dozens
+of streams can be watched from one process at low CPU without stalling the
+measurements.
+
+Run:
+  python check.py
+  python check.py --watch
+  python check.py --watch --type EEG --name Muse-FDCA --name Muse-07D2
+Stop:
+  Ctrl+C
+"""
+
+import argparse
+import sys
 import time
-from pylsl import resolve_streams
+from collections import deque
+from typing import Deque, Dict, List, Optional, Tuple
+
+import numpy as np
+from pylsl import ContinuousResolver, StreamInlet, local_clock, resolve_streams
+
+
+# How often we poll every inlet for new chunks
+POLL_SEC = 0.05
+
+# How often the table is redrawn
+REFRESH_SEC = 1.0
+
+# How often we check the (non-blocking) resolver for new streams to attach
+RESOLVE_EVERY_SEC = 1.0
+
+# How often the clock offset is re-estimated per stream
+CLOCK_EVERY_SEC = 5.0
+
+# Clock refreshes of successive streams are offset by this much so they don't
+# all land on the same poll pass
+CLOCK_STAGGER_SEC = 0.1
+
+# time_correction() timeout; only the first estimate per stream can take this long,
+# later calls return the background estimate immediately
+CLOCK_TIMEOUT_SEC = 0.005
+
+# Sliding window used for rate / jitter / throughput
+WINDOW_SEC = 5.0
+
+# An interval longer than this many nominal periods counts as a gap
+GAP_FACTOR = 2.0
+
+# No samples for this long => stream is reported as STALLED (one dropout)
+DROPOUT_SEC = 1.0
+
+# Per-pull cap so one busy stream can't starve the others
+MAX_CHUNK = 1024
+
+# Inlet buffer; we only need a few seconds since we pull continuously
+MAX_BUFLEN_SEC = 10
+
+# Bytes per value for pylsl channel formats (cf_string is measured per sample)
+_FORMAT_BYTES: Dict[int, int] = {
+    1: 4,  # cf_float32
+    2: 8,  # cf_double64
+    4: 4,  # cf_int32
+    5: 2,  # cf_int16
+    6: 1,  # cf_int8
+    7: 8,  # cf_int64
+}
+_CF_STRING = 3
+
+
+class StreamStats:
+    """Rolling health statistics for one attached stream."""
+
+    def __init__(self, info, clock_phase: float = 0.0):
+        self.info = info
+        self.name = info.name()
+        self.type = info.type()
+        self.source_id = info.source_id()
+        self.nominal_srate = info.nominal_srate()
+        self.channel_count = info.channel_count()
+        self.channel_format = info.channel_format()
+
+        self.inlet = StreamInlet(info, max_buflen=MAX_BUFLEN_SEC, recover=True)
+
+        # (receive_time, timestamps, nbytes) per pulled chunk, pruned to WINDOW_SEC
+        self._chunks: Deque[Tuple[float, np.ndarray, int]] = deque()
+
+        self.total_samples = 0
+        self.gaps = 0
+        self.dropouts = 0
+        self.stalled = False
+        self.last_ts: Optional[float] = None
+        self.last_rx: Optional[float] = None
+        self.clock_offset: Optional[float] = None
+        self._next_clock = local_clock() + clock_phase
+        self.error: Optional[str] = None
+
+    def _chunk_bytes(self, samples) -> int:
+        if self.channel_format == _CF_STRING:
+            return sum(len(v) for s in samples for v in s)
+        return len(samples) * self.channel_count * _FORMAT_BYTES.get(self.channel_format, 4)
+
+    def poll(self, now: float):
+        """Drain whatever is buffered on the inlet (non-blocking)."""
+        try:
+            samples, timestamps = self.inlet.pull_chunk(timeout=0.0, max_samples=MAX_CHUNK)
+        except Exception as e:
+            self.error = str(e)
+            return
+        self.error = None
+
+        if timestamps:
+            ts = np.asarray(timestamps, dtype=np.float64)
+
+            if self.nominal_srate > 0:
+                dt = np.diff(ts, prepend=ts[0] if self.last_ts is None else self.last_ts)
+                self.gaps += int(np.count_nonzero(dt > GAP_FACTOR / self.nominal_srate))
+
+            self._chunks.append((now, ts, self._chunk_bytes(samples)))
+            self.total_samples += len(ts)
+            self.last_ts = float(ts[-1])
+            self.last_rx = now
+            self.stalled = False
+        elif self.last_rx is not None and not self.stalled and now - self.last_rx > DROPOUT_SEC:
+            self.stalled = True
+            self.dropouts += 1
+
+        while self._chunks and now - self._chunks[0][0] > WINDOW_SEC:
+            self._chunks.popleft()
+
+        if now >= self._next_clock:
+            self._next_clock = now + CLOCK_EVERY_SEC
+            try:
+                self.clock_offset = self.inlet.time_correction(timeout=CLOCK_TIMEOUT_SEC)
+            except Exception:
+                pass
+
+    def summary(self, now: float) -> Dict[str, Optional[float]]:
+        """Compute rate / jitter / throughput over the current window."""
+        out: Dict[str, Optional[float]] = {"rate": None, "jitter_ms": None, "kbps": None}
+        if not self._chunks:
+            return out
+
+        ts = np.concatenate([c[1] for c in self._chunks])
+        nbytes = sum(c[2] for c in self._chunks)
+        span = now - self._chunks[0][0]
+        out["kbps"] = nbytes / 1024.0 / max(span, POLL_SEC)
+
+        if len(ts) >= 2 and ts[-1] > ts[0]:
+            out["rate"] = (len(ts) - 1) / (ts[-1] - ts[0])
+            out["jitter_ms"] = float(np.std(np.diff(ts))) * 1000.0
+        return out
+
+    def state(self) -> str:
+        if self.error:
+            return "ERROR"
+        if self.last_rx is None:
+            return "WAIT"
+        return "STALLED" if self.stalled else "OK"
+
+
+def _matches(info, args) -> bool:
+    if args.name and info.name() not in args.name:
+        return False
+    if args.type and info.type() not in args.type:
+        return False
+    if args.source_id and info.source_id() not in args.source_id:
+        return False
+    return True
+
+
+def _fmt(v: Optional[float], spec: str) -> str:
+    return "-" if v is None else format(v, spec)
+
+
+def render(stats: List[StreamStats], now: float) -> str:
+    header = (
+        f"{'name':<22} {'type':<6} {'ch':>3} {'nominal':>8} {'rate':>8} "
+        f"{'gaps':>6} {'drop':>5} {'jit ms':>7} {'off ms':>8} {'kB/s':>7}  state"
+    )
+    lines = [header, "-" * len(header)]
+    for st in stats:
+        s = st.summary(now)
+        offset_ms = None if st.clock_offset is None else st.clock_offset * 1000.0
+        nominal = "irreg" if st.nominal_srate <= 0 else f"{st.nominal_srate:.1f}"
+        lines.append(
+            f"{st.name[:22]:<22} {st.type[:6]:<6} {st.channel_count:>3} {nominal:>8} "
+            f"{_fmt(s['rate'], '.1f'):>8} {st.gaps:>6} {st.dropouts:>5} "
+            f"{_fmt(s['jitter_ms'], '.2f'):>7} {_fmt(offset_ms, '.2f'):>8} "
+            f"{_fmt(s['kbps'], '.1f'):>7}  {st.state()}"
+        )
+    if not stats:
+        lines.append("(no matching streams yet)")
+    return "\n".join(lines)
+
+
+def list_streams():
+    print("Resolving all LSL streams (may take a few seconds)...\n")
+    streams = resolve_streams(wait_time=2.0)
+
+    print(f"Found {len(streams)} stream(s):\n")
+    for s in streams:
+        print(f"Name: {s.name()}")
+        print(f"  Type: {s.type()}")
+        print(f"  Source ID: {s.source_id()}")
+        print("-" * 40)
+
+
+def watch(args):
+    stats: Dict[str, StreamStats] = {}  # uid -> stats
+    resolver = ContinuousResolver()
+    next_resolve = 0.0
+    next_render = 0.0
+    clear = "\033[H\033[J" if sys.stdout.isatty() else ""
+
+    try:
+        while True:
+            now = local_clock()
+
+            if now >= next_resolve:
+                next_resolve = now + RESOLVE_EVERY_SEC
+                for info in resolver.results():
+                    uid = info.uid()
+                    if uid in stats or not _matches(info, args):
+                        continue
+                    phase = (len(stats) * CLOCK_STAGGER_SEC) % CLOCK_EVERY_SEC
+                    stats[uid] = StreamStats(info, clock_phase=phase)
+
+            for st in stats.values():
+                st.poll(now)
+
+            if now >= next_render:
+                next_render = now + REFRESH_SEC
+                ordered = sorted(stats.values(), key=lambda st: (st.name, st.source_id))
+                print(clear + render(ordered, now), flush=True)
+                if not clear:
+                    print("", flush=True)
+
+            time.sleep(POLL_SEC)
+
+    except KeyboardInterrupt:
+        print("\nStopping inspector.", flush=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="List or inspect LSL streams.")
+    parser.add_argument("--watch", action="store_true", help="attach to streams and show live health stats")
+    parser.add_argument("--name", action="append", help="only watch streams with this name (repeatable)")
+    parser.add_argument("--type", action="append", help="only watch streams of this type (repeatable)")
+    parser.add_argument("--source-id", action="append", help="only watch streams with this source_id (repeatable)")
+    args = parser.parse_args()
 
-print("Resolving all EEG streams (may take a few seconds)...\n")
-time.sleep(2)
+    if args.watch:
+        watch(args)
+    else:
+        list_streams()
 
-streams = resolve_streams()
 
-print(f"Found {len(streams)} EEG stream(s):\n")
-for s in streams:
-    print(f"Name: {s.name()}")
-    print(f"  Type: {s.type()}")
-    print(f"  Source ID: {s.source_id()}")
-    print("-" * 40)
+if __name__ == "__main__":
+    main()
@@ -8,7 +8,10 @@ from pylsl import resolve_streams, StreamInlet
 
 from collections import deque
 
-from tkinter import messagebox
+import numpy as np
+
+from band_features import band_layout, reduce_features
+from signal_quality import SignalQualityGate
 
 
 
@@ -18,6 +21,127 @@ MOVE_PIXELS = 10
 TICK_MS = 1000  # how often we compare values & move
 FAILSAFE_MS = 30_000   # 30 seconds
 
+# Max samples per chunked pull in the reader threads
+READER_MAX_CHUNK = 256
+
+# Timeout per attempt when fetching full stream info (channel labels) for a new reader
+INFO_TIMEOUT_SEC = 2.0
+
+# Idle mode (no match running): readers sleep between slow display refreshes,
+# drain the inlet keeping only the newest sample, and the watchdog heartbeat slows down.
+IDLE_REFRESH_SEC = 1.0
+IDLE_MAX_CHUNK = 4096
+IDLE_WATCHDOG_MS = 1000
+
+
+def _same_layout(a, b):
+    if a is None or b is None:
+        return a is b
+    return a.keys() == b.keys() and all(np.array_equal(a[k], b[k]) for k in a)
+
+
+# Mainloop watchdog: heartbeat period and how late a callback may run before we log it
+WATCHDOG_MS = 100
+STALL_THRESHOLD_MS = 50
+
+
+class MainloopWatchdog:
+    """
+    Measures how long and how late Tk mainloop callbacks run and logs stalls.
+
+    Every callback wrapped with wrap() is timed, and any run longer than
+    STALL_THRESHOLD_MS is logged by name. Callbacks scheduled through after()
+    also log when they start more than STALL_THRESHOLD_MS after their due time,
+    naming the wrapped callback(s) that held the mainloop meanwhile.
+    A heartbeat every WATCHDOG_MS catches blocking outside wrapped callbacks
+    (unwrapped handlers, OS events).
+    """
+
+    def __init__(self, root, interval_ms=WATCHDOG_MS, threshold_ms=STALL_THRESHOLD_MS):
+        self.root = root
+        self.interval_ms = interval_ms
+        self.threshold_ms = threshold_ms
+
+        self._expected = None
+        self._after_id = None
+        # Recent wrapped runs: (name, start, end) in perf_counter seconds
+        self._runs = deque(maxlen=64)
+
+    def _busy_during(self, lo, hi):
+        """[(name, ms)] of wrapped runs overlapping [lo, hi], longest first."""
+        busy = []
+        for name, start, end in self._runs:
+            overlap = min(end, hi) - max(start, lo)
+            if overlap > 0:
+                busy.append((name, overlap * 1000.0))
+        return sorted(busy, key=lambda b: -b[1])
+
+    def wrap(self, fn, name=None, due=None):
+        """
+        Return fn wrapped so its run time is checked under `name`; with `due`
+        (a perf_counter time), also check how late it started.
+        """
+        name = name or getattr(fn, "__qualname__", repr(fn))
+
+        def timed(*args, **kwargs):
+            t0 = time.perf_counter()
+            if due is not None:
+                late_ms = (t0 - due) * 1000.0
+                if late_ms > self.threshold_ms:
+                    busy = self._busy_during(due, t0)
+                    cause = busy[0][0] if busy else "unknown (unwrapped callback or OS event)"
+                    print(f"[STALL] {name} ran {late_ms:.1f} ms late; mainloop was busy in: {cause}", flush=True)
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                t1 = time.perf_counter()
+                self._runs.append((name, t0, t1))
+                dur_ms = (t1 - t0) * 1000.0
+                if dur_ms > self.threshold_ms:
+                    print(f"[STALL] {name} blocked the mainloop for {dur_ms:.1f} ms", flush=True)
+
+        return timed
+
+    def after(self, widget, ms, fn, name=None):
+        """widget.after(ms, fn), with fn's run time and start lateness checked."""
+        due = time.perf_counter() + ms / 1000.0
+        return widget.after(ms, self.wrap(fn, name, due=due))
+
+    def set_interval(self, interval_ms):
+        """Change the heartbeat period; takes effect immediately if running."""
+        if interval_ms == self.interval_ms:
+            return
+        self.interval_ms = interval_ms
+        if self._after_id:
+            self.start()
+
+    def start(self):
+        self.stop()
+        self._expected = time.perf_counter() + self.interval_ms / 1000.0
+        self._after_id = self.root.after(self.interval_ms, self._heartbeat)
+
+    def stop(self):
+        if self._after_id:
+            self.root.after_cancel(self._after_id)
+            self._after_id = None
+
+    def _heartbeat(self):
+        now = time.perf_counter()
+        late_ms = (now - self._expected) * 1000.0
+
+        # Wrapped callbacks log themselves; only report lateness they don't explain
+        if late_ms > self.threshold_ms:
+            unexplained_ms = late_ms - sum(ms for _, ms in self._busy_during(self._expected, now))
+            if unexplained_ms > self.threshold_ms:
+                print(
+                    f"[STALL] mainloop blocked {unexplained_ms:.1f} ms outside wrapped callbacks "
+                    f"(unwrapped handler or OS event)",
+                    flush=True,
+                )
+
+        self._expected = now + self.interval_ms / 1000.0
+        self._after_id = self.root.after(self.interval_ms, self._heartbeat)
+
 
 # class PlayerPanel:
 #     def __init__(self, parent, title: str, desired_source_id: str):
@@ -94,8 +218,10 @@ FAILSAFE_MS = 30_000   # 30 seconds
 #     def stop(self):
 #         self.stop_event.set()
 class PlayerPanel:
-    def __init__(self, parent, title: str, name_var: str, desired_source_id: str):
+    def __init__(self, parent, title: str, name_var: str, desired_source_id: str, watchdog=None):
         self.desired_source_id = desired_source_id
+        self.title = title
+        self.watchdog = watchdog
 
         self.frame = ttk.LabelFrame(parent, text=title, padding=6)
 
@@ -106,11 +232,15 @@ class PlayerPanel:
         self.type_var = tk.StringVar(value="")
         self.sourceid_var = tk.StringVar(value="")
         self.value_var = tk.StringVar(value="")
+        self.quality_var = tk.StringVar(value="")
+        self.budget_var = tk.StringVar(value="")
 
         self._row("name", self.name_var)
         self._row("type", self.type_var)
         self._row("source_id", self.sourceid_var)
         self._row("value", self.value_var)
+        self._row("quality", self.quality_var)
+        self._row("budget", self.budget_var)
 
         self.inlet = None
         self.stop_event = threading.Event()
@@ -119,10 +249,18 @@ class PlayerPanel:
         # Latest (for display/debug)
         self.latest_value = None
 
+        # {band: channel indices} for multi-channel band streams; None for single-channel
+        self.layout = None
+
         # Queue of *new* values so the game can consume them exactly once
         self._q = deque()
         self._q_lock = threading.Lock()
 
+        # Set while a match is running; cleared => idle (slow display, no queueing)
+        self._active = threading.Event()
+        # Wakes an idle reader immediately (on Start or stop)
+        self._wake = threading.Event()
+
     def _row(self, label, var):
         row = ttk.Frame(self.frame)
         row.pack(fill=tk.X, pady=2)
@@ -130,15 +268,17 @@ class PlayerPanel:
         ttk.Label(row, textvariable=var).pack(side=tk.LEFT)
 
     def clear(self):
+        self.stop()
         self.found_var.set("Not found")
         self.name_var.set("")
         self.type_var.set("")
         self.sourceid_var.set("")
         self.value_var.set("")
+        self.quality_var.set("")
+        self.budget_var.set("")
         self.latest_value = None
         with self._q_lock:
             self._q.clear()
-        self.stop()
 
     def bind_stream(self, stream_info):
         self.found_var.set("Found player stream ✅")
@@ -150,33 +290,135 @@ class PlayerPanel:
     def start_reader(self, stream_info):
         self.stop()
         self.stop_event = threading.Event()
+        self._wake = threading.Event()
         self.value_var.set("")
+        self.quality_var.set("")
+        self.budget_var.set("")
         self.latest_value = None
+        self.layout = None
         with self._q_lock:
             self._q.clear()
 
+        # The thread gets its own stop/wake events and inlet, so a reader left over
+        # from a previous bind stops on its own event and never touches the new one's state
         self.inlet = StreamInlet(stream_info)
-        self.reader_thread = threading.Thread(target=self.reader_loop, daemon=True)
+        self.reader_thread = threading.Thread(
+            target=self.reader_loop, args=(self.stop_event, self._wake, self.inlet), daemon=True
+        )
         self.reader_thread.start()
 
-    def reader_loop(self):
-        while not self.stop_event.is_set():
-            sample, ts = self.inlet.pull_sample(timeout=0.5)
-            if not sample:
+    def reader_loop(self, stop_event, wake, inlet):
+        info = self._fetch_info(stop_event, inlet)
+        if info is None:
+            return
+        try:
+            layout = band_layout(info)
+        except ValueError as e:
+            print(f"[WARN] {self.title}: {e}", flush=True)
+            self._after(0, lambda: self.found_var.set("Unsupported channel layout ❌"))
+            return
+        gate = SignalQualityGate(info.channel_count())
+
+        # Published for the game's vectorized reduction
+        if not stop_event.is_set():
+            self.layout = layout
+
+        while not stop_event.is_set():
+            if not self._active.is_set():
+                self._idle_step(stop_event, wake, inlet, layout, gate)
+                continue
+
+            samples, ts = inlet.pull_chunk(timeout=0.5, max_samples=READER_MAX_CHUNK)
+            if not ts:
                 continue
+            self._handle_chunk(stop_event, samples, layout, gate, idle=False)
+
+    def _handle_chunk(self, stop_event, samples, layout, gate, idle):
+        """
+        Gate a pulled chunk, then queue and display its newest good sample.
+        When idle the queue holds only that one sample, so Start has a value ready.
+        """
+        good = gate.process(samples)
+        quality, budget = gate.quality_text(), gate.budget_text()
 
-            v = sample[0]
-            self.latest_value = v
+        v = None
+        if len(good):
+            # Only the newest sample of a chunk matters to the game
+            row = good[-1]
+            v = float(reduce_features(row[None, :], layout)[0])
 
-            # Push into queue so game loop can consume each value once
             with self._q_lock:
-                self._q.append(v)
+                # stop() is set before the queue is cleared, so a stopped reader can't refill it
+                if stop_event.is_set():
+                    return
+                self.latest_value = v
+                # Push into queue so game loop can consume each value once
+                if idle:
+                    self._q.clear()
+                self._q.append(row)
+
+        # update UI safely (one callback per chunk)
+        def show():
+            if stop_event.is_set():
+                return
+            if v is not None:
+                self.value_var.set(f"{v:.6f}")
+            self.quality_var.set(quality)
+            self.budget_var.set(budget)
+
+        self._after(0, show)
+
+    def _fetch_info(self, stop_event, inlet):
+        """
+        Full info (with channel labels) is only available from the inlet.
+        Keep retrying while the stream doesn't answer; None if we were stopped.
+        """
+        waiting = False
+        while not stop_event.is_set():
+            try:
+                info = inlet.info(timeout=INFO_TIMEOUT_SEC)
+            except RuntimeError as e:
+                # pylsl's TimeoutError / LostError both derive from RuntimeError
+                if not waiting:
+                    waiting = True
+                    print(f"[WARN] {self.title}: stream info unavailable ({e}); retrying", flush=True)
+                    self._after(0, lambda: self.found_var.set("Stream not responding ⏳ (retrying)"))
+                continue
+            if waiting and not stop_event.is_set():
+                self._after(0, lambda: self.found_var.set("Found player stream ✅"))
+            return info
+        return None
+
+    def _idle_step(self, stop_event, wake, inlet, layout, gate):
+        """Block until woken or the next slow refresh, then show only the newest sample."""
+        wake.wait(IDLE_REFRESH_SEC)
+        wake.clear()
+        if stop_event.is_set() or self._active.is_set():
+            return
 
-            # update UI safely
-            self.frame.after(0, lambda val=v: self.value_var.set(f"{val:.6f}"))
+        samples, ts = inlet.pull_chunk(timeout=0.0, max_samples=IDLE_MAX_CHUNK)
+        if not ts:
+            return
+        self._handle_chunk(stop_event, samples, layout, gate, idle=True)
+
+    def set_active(self, active: bool):
+        """Switch between full-rate (match running) and idle reading."""
+        if active:
+            # Keep the newest idle sample queued so the first tick after Start can move
+            self._active.set()
+        else:
+            self._active.clear()
+            with self._q_lock:
+                self._q.clear()
+        self._wake.set()
+
+    def _after(self, ms, fn):
+        if self.watchdog is not None:
+            return self.watchdog.after(self.frame, ms, fn, name=f"{self.title} value update")
+        return self.frame.after(ms, fn)
 
     def get_next_value(self):
-        """Return the most recently received value (and drop older queued values)."""
+        """Return the most recently received sample row (and drop older queued rows)."""
         with self._q_lock:
             if not self._q:
                 return None
@@ -186,6 +428,7 @@ class PlayerPanel:
 
     def stop(self):
         self.stop_event.set()
+        self._wake.set()
 
 
 
@@ -194,6 +437,7 @@ class App:
         self.root = tk.Tk()
         self.root.title("Two-Player EEG Bind (LSL)")
         self._failsafe_after_id = None
+        self.watchdog = MainloopWatchdog(self.root)
 
 
         # Fullscreen-ish by default (macOS/Windows usually)
@@ -215,7 +459,7 @@ class App:
         PANEL_PAD = 6
 
         # Left panel
-        self.left = PlayerPanel(outer, "Player 1", name_var = "Muse-FDCA_band", desired_source_id="")
+        self.left = PlayerPanel(outer, "Player 1", name_var = "Muse-FDCA_band", desired_source_id="", watchdog=self.watchdog)
         self.left.frame.config(width=PANEL_W, padding=6)
         self.left.frame.pack_propagate(False)  # IMPORTANT: keep the width you set
         self.left.frame.pack(side=tk.LEFT, fill=tk.Y, expand=False, padx=(0, PANEL_PAD))
@@ -245,15 +489,15 @@ class App:
         self._load_and_place_images()
 
         # Buttons
-        self.scan_btn = ttk.Button(center, text="Scan & Bind Players", command=self.scan_and_bind)
+        self.scan_btn = ttk.Button(center, text="Scan & Bind Players", command=self.watchdog.wrap(self.scan_and_bind))
         self.scan_btn.pack(pady=(10, 6))
 
        # self.start_btn = ttk.Button(center, text="Start", command=self.start_game, state="disabled")
-        self.start_btn = ttk.Button(center, text="Start", command=self.toggle_game, state="disabled")
+        self.start_btn = ttk.Button(center, text="Start", command=self.watchdog.wrap(self.toggle_game), state="disabled")
 
         self.start_btn.pack(pady=(0, 10))
 
-        self.reset_btn = ttk.Button(center, text="Reset", command=self.reset_game, state="disabled")
+        self.reset_btn = ttk.Button(center, text="Reset", command=self.watchdog.wrap(self.reset_game), state="disabled")
         self.reset_btn.pack(pady=(0, 10))
 
 
@@ -263,7 +507,7 @@ class App:
         # Right panel (Player 2)
         # self.right = PlayerPanel(outer, "Player 2", desired_source_id="player2_mock")
         # self.right.frame.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=10)
-        self.right = PlayerPanel(outer, "Player 2", name_var = "Muse-07D2_band", desired_source_id="")
+        self.right = PlayerPanel(outer, "Player 2", name_var = "Muse-07D2_band", desired_source_id="", watchdog=self.watchdog)
         self.right.frame.config(width=PANEL_W, padding=6)
         self.right.frame.pack_propagate(False)
         self.right.frame.pack(side=tk.LEFT, fill=tk.Y, expand=False, padx=(0, 0))
@@ -278,7 +522,9 @@ class App:
         self._last_canvas_size = (None, None)
         self._logo_initialized = False
 
-        self.canvas.bind("<Configure>", lambda e: self._recenter_canvas_art())
+        self.canvas.bind("<Configure>", self.watchdog.wrap(lambda e: self._recenter_canvas_art(), "_recenter_canvas_art"))
+
+        self._set_idle(True)
     # def toggle_game(self):
     #     if self.game_running:
     #         # STOP / PAUSE
@@ -297,6 +543,7 @@ class App:
         if self.game_running:
             # STOP / PAUSE
             self.game_running = False
+            self._set_idle(True)
             self.start_btn.config(text="Start")
             self.status_var.set("Paused.")
 
@@ -307,19 +554,28 @@ class App:
             return
 
         # START / RESUME
+        self._hide_win_overlay()
         self.game_running = True
+        self._set_idle(False)
         self.start_btn.config(text="Stop")
         self.reset_btn.config(state="disabled")
         self.status_var.set("Game running: consuming new samples and moving logo once per pair...")
 
         # start failsafe timer
-        self._failsafe_after_id = self.root.after(FAILSAFE_MS, self._failsafe_trigger)
+        self._failsafe_after_id = self.watchdog.after(self.root, FAILSAFE_MS, self._failsafe_trigger)
 
         self._game_tick()
 
 
+    def _set_idle(self, idle: bool):
+        """Idle between matches: readers stop queueing and refresh slowly; full rate on Start."""
+        self.left.set_active(not idle)
+        self.right.set_active(not idle)
+        self.watchdog.set_interval(IDLE_WATCHDOG_MS if idle else WATCHDOG_MS)
+
     def _stop_game_ui(self, status="Paused."):
         self.game_running = False
+        self._set_idle(True)
         self.start_btn.config(text="Start")
         self.status_var.set(status)
 
@@ -339,7 +595,34 @@ class App:
         self._stop_game_ui(status=f"{winner} wins!")
         self.reset_btn.config(state="normal")
 
-        messagebox.showinfo("Winner!", f"{winner} Wins!")
+        # In-canvas overlay instead of a modal dialog so the mainloop keeps running
+        self._show_win_overlay(f"{winner} Wins!")
+
+    def _show_win_overlay(self, text: str):
+        self._hide_win_overlay()
+
+        cw = self.canvas.winfo_width()
+        ch = self.canvas.winfo_height()
+        if cw <= 1 or ch <= 1:
+            return
+
+        x, y = cw // 2, ch // 2
+        box_w, box_h = min(420, cw - 20), 120
+        self.canvas.create_rectangle(
+            x - box_w // 2, y - box_h // 2, x + box_w // 2, y + box_h // 2,
+            fill="#222222", outline="#f5c518", width=3, tags=("win_overlay",),
+        )
+        self.canvas.create_text(
+            x, y - 12, text=text, fill="white", font=("Helvetica", 28, "bold"), tags=("win_overlay",),
+        )
+        self.canvas.create_text(
+            x, y + 34, text="click to dismiss", fill="#bbbbbb", font=("Helvetica", 11), tags=("win_overlay",),
+        )
+        self.canvas.tag_raise("win_overlay")
+        self.canvas.tag_bind("win_overlay", "<Button-1>", lambda e: self._hide_win_overlay())
+
+    def _hide_win_overlay(self):
+        self.canvas.delete("win_overlay")
 
 
     def _check_winner(self) -> bool:
@@ -407,6 +690,8 @@ class App:
         - re-center logo
         """
         self.game_running = False
+        self._set_idle(True)
+        self._hide_win_overlay()
 
         # stop streams/threads
         self.left.stop()
@@ -545,13 +830,13 @@ class App:
                     if p1 and p2:
                         self.start_btn.config(state="normal")
 
-                self.root.after(0, apply)
+                self.watchdog.after(self.root, 0, apply, name="scan_and_bind.apply")
 
             finally:
                 def done():
                     self.scanning = False
                     self.scan_btn.config(state="normal")
-                self.root.after(0, done)
+                self.watchdog.after(self.root, 0, done, name="scan_and_bind.done")
 
         threading.Thread(target=worker, daemon=True).start()
 
@@ -559,6 +844,7 @@ class App:
         if self.game_running:
             return
         self.game_running = True
+        self._set_idle(False)
         self.start_btn.config(state="disabled")
         self.status_var.set("Game running: comparing values and moving logo...")
 
@@ -568,12 +854,13 @@ class App:
         if not self.game_running:
             return
 
-        # Pull exactly one new value from each queue (if available)
-        v1 = self.left.get_next_value()
-        v2 = self.right.get_next_value()
+        # Pull exactly one new sample row from each queue (if available)
+        r1 = self.left.get_next_value()
+        r2 = self.right.get_next_value()
 
         # Only move if BOTH produced a new value
-        if v1 is not None and v2 is not None:
+        if r1 is not None and r2 is not None:
+            v1, v2 = self._player_features(r1, r2)
             if v1 < v2:
                 self._move_logo(dx=-MOVE_PIXELS)
             elif v2 < v1:
@@ -581,8 +868,20 @@ class App:
             # equal => no move
 
         # Poll fairly often; movement will still be once per new pair
-        self.root.after(TICK_MS, self._game_tick)
+        self.watchdog.after(self.root, TICK_MS, self._game_tick)
+
+
+    def _player_features(self, r1, r2):
+        """Reduce both players' latest rows to one feature value each."""
+        if r1.shape == r2.shape and _same_layout(self.left.layout, self.right.layout):
+            # One vectorized reduction across channels and players
+            v = reduce_features(np.stack([r1, r2]), self.left.layout)
+            return v[0], v[1]
 
+        # Different stream layouts: reduce each player separately
+        v1 = reduce_features(r1[None, :], self.left.layout)[0]
+        v2 = reduce_features(r2[None, :], self.right.layout)[0]
+        return v1, v2
 
     # def _game_tick(self):
     #     if not self.game_running:
@@ -620,11 +919,13 @@ class App:
 
     def on_close(self):
         self.game_running = False
+        self.watchdog.stop()
         self.left.stop()
         self.right.stop()
         self.root.destroy()
 
     def run(self):
+        self.watchdog.start()
         self.root.mainloop()
 
 
@@ -2,8 +2,18 @@
 """
 muse_lsl_rename_bridge.py
 
-Reads two raw Muse LSL streams (both named "Muse", type "EEG") and republishes
-new LSL streams with unique names (e.g., "Muse-07D2" and "Muse-FDCA").
+Reads the raw Muse LSL streams of two headsets (all named "Muse") and republishes
+new LSL streams with unique names per device and modality:
+
+  EEG  -> "Muse-07D2"        (unchanged, what Neuropype binds to)
+  PPG  -> "Muse-07D2_PPG"
+  ACC  -> "Muse-07D2_ACC"
+  GYRO -> "Muse-07D2_GYRO"
+
+muselsl gives every modality of a headset the same source_id, so relays are
+keyed by (source_id, type). All modalities are found by one background
+ContinuousResolver (polled without blocking, so discovery never holds up
+forwarding) and forwarded in chunks, so adding modalities costs little extra.
 
 You cannot rename an existing LSL stream in-place; this script republishes
 a new stream with the same data and timestamps.
@@ -18,7 +28,7 @@ Stop:
 import time
 from typing import Dict, Optional, Tuple
 
-from pylsl import resolve_byprop, StreamInlet, StreamInfo, StreamOutlet
+from pylsl import ContinuousResolver, StreamInlet, StreamInfo, StreamOutlet
 
 
 # Map: original source_id -> new unique stream name you want
@@ -27,8 +37,30 @@ SOURCEID_TO_NEWNAME: Dict[str, str] = {
     "MuseAEA692BD-3F88-9724-A811-249F4450D2B3": "Muse-FDCA",
 }
 
-# Only relay this stream type (matches what you printed)
-STREAM_TYPE = "EEG"
+# Stream types to relay -> suffix appended to the device name.
+# EEG keeps the bare device name so existing Neuropype pipelines still bind.
+# (muselsl only publishes PPG/ACC/GYRO when started with --ppg/--acc/--gyro)
+MODALITY_SUFFIX: Dict[str, str] = {
+    "EEG": "",
+    "PPG": "_PPG",
+    "ACC": "_ACC",
+    "GYRO": "_GYRO",
+}
+
+# How often to check the (non-blocking) resolver for streams that aren't attached yet
+RESOLVE_EVERY_SEC = 1.0
+
+# Sleep between forwarding passes; each pass moves whole chunks, so this only adds latency
+POLL_SEC = 0.005
+
+# Once attached streams have been silent for IDLE_AFTER_SEC, the sleep doubles up to
+# IDLE_POLL_SEC (idle mode). With no headset attached at all we simply sleep until
+# the next resolver check.
+IDLE_AFTER_SEC = 1.0
+IDLE_POLL_SEC = 0.25
+
+# Cap per pull so one modality can't starve the others
+MAX_CHUNK = 1024
 
 # Optional: only relay streams whose name matches this exactly (muselsl uses "Muse")
 REQUIRE_NAME: Optional[str] = "Muse"
@@ -40,7 +72,7 @@ def make_outlet_from_source(src_info, new_name: str) -> StreamOutlet:
 
     info = StreamInfo(
         name=new_name,
-        type=src_info.type(),  # keep "EEG"
+        type=src_info.type(),  # keep "EEG" / "PPG" / "ACC" / "GYRO"
         channel_count=src_info.channel_count(),
         nominal_srate=src_info.nominal_srate(),
         channel_format=src_info.channel_format(),
@@ -58,17 +90,32 @@ def make_outlet_from_source(src_info, new_name: str) -> StreamOutlet:
     return StreamOutlet(info)
 
 
-def discover_sources() -> Dict[str, object]:
-    """Find candidate streams and return {source_id: StreamInfo} for the ones we care about."""
-    streams = resolve_byprop("type", STREAM_TYPE, timeout=2)
+def relay_name(source_id: str, stream_type: str) -> str:
+    """New stream name for a (device, modality) pair."""
+    return SOURCEID_TO_NEWNAME[source_id] + MODALITY_SUFFIX[stream_type]
+
+
+def make_resolver() -> ContinuousResolver:
+    """Background resolver for every modality of the headsets we relay."""
+    if REQUIRE_NAME is not None:
+        return ContinuousResolver(prop="name", value=REQUIRE_NAME)
+    return ContinuousResolver()
+
+
+def discover_sources(resolver: ContinuousResolver) -> Dict[Tuple[str, str], object]:
+    """
+    Read the resolver's current results (non-blocking) and return
+    {(source_id, type): StreamInfo} for the ones we care about.
+    """
+    streams = resolver.results()
 
-    found: Dict[str, object] = {}
+    found: Dict[Tuple[str, str], object] = {}
     for s in streams:
         if REQUIRE_NAME is not None and s.name() != REQUIRE_NAME:
             continue
-        sid = s.source_id()
-        if sid in SOURCEID_TO_NEWNAME:
-            found[sid] = s
+        sid, stype = s.source_id(), s.type()
+        if sid in SOURCEID_TO_NEWNAME and stype in MODALITY_SUFFIX:
+            found[(sid, stype)] = s
     return found
 
 
@@ -77,41 +124,67 @@ def main():
     print("Looking for these source_ids:", flush=True)
     for k, v in SOURCEID_TO_NEWNAME.items():
         print(f"  {k}  ->  {v}", flush=True)
+    print(f"Modalities: {', '.join(MODALITY_SUFFIX)}", flush=True)
     print("", flush=True)
 
-    relays: Dict[str, Tuple[StreamInlet, StreamOutlet, str]] = {}  # sid -> (inlet, outlet, new_name)
+    # (sid, type) -> (inlet, outlet, new_name)
+    relays: Dict[Tuple[str, str], Tuple[StreamInlet, StreamOutlet, str]] = {}
+    expected = len(SOURCEID_TO_NEWNAME) * len(MODALITY_SUFFIX)
+    next_resolve = 0.0
+    resolver = make_resolver()
+    poll_sec = POLL_SEC
+    last_data = time.monotonic()
 
     try:
         while True:
-            # Discover and attach any missing streams
-            found = discover_sources()
-            for sid, src_info in found.items():
-                if sid in relays:
-                    continue
-
-                new_name = SOURCEID_TO_NEWNAME[sid]
-                inlet = StreamInlet(src_info, recover=True)
-                outlet = make_outlet_from_source(src_info, new_name)
-
-                relays[sid] = (inlet, outlet, new_name)
-
-                print(
-                    f"[ADD] source_id='{sid}' name='{src_info.name()}' type='{src_info.type()}' "
-                    f"-> republishing as name='{new_name}' (type='{src_info.type()}')",
-                    flush=True,
-                )
-
-            # Forward samples (non-blocking)
-            for sid, (inlet, outlet, new_name) in list(relays.items()):
+            # Discover and attach any missing streams (one resolver for all modalities)
+            now = time.monotonic()
+            if len(relays) < expected and now >= next_resolve:
+                next_resolve = now + RESOLVE_EVERY_SEC
+                found = discover_sources(resolver)
+                for key, src_info in found.items():
+                    if key in relays:
+                        continue
+
+                    sid, stype = key
+                    new_name = relay_name(sid, stype)
+                    inlet = StreamInlet(src_info, recover=True)
+                    outlet = make_outlet_from_source(src_info, new_name)
+
+                    relays[key] = (inlet, outlet, new_name)
+
+                    print(
+                        f"[ADD] source_id='{sid}' name='{src_info.name()}' type='{stype}' "
+                        f"-> republishing as name='{new_name}' (type='{stype}')",
+                        flush=True,
+                    )
+
+            if not relays:
+                # Idle: nothing to forward, sleep until the next resolver check
+                time.sleep(max(0.0, next_resolve - time.monotonic()))
+                continue
+
+            # Forward everything buffered since the last pass, one chunk per stream (non-blocking)
+            forwarded = False
+            for (sid, stype), (inlet, outlet, new_name) in relays.items():
                 try:
-                    sample, ts = inlet.pull_sample(timeout=0.0)
-                    if ts:
-                        outlet.push_sample(sample, ts)
+                    samples, timestamps = inlet.pull_chunk(timeout=0.0, max_samples=MAX_CHUNK)
+                    if timestamps:
+                        outlet.push_chunk(samples, timestamps)
+                        forwarded = True
                 except Exception as e:
                     # If a headset disconnects, keep running; it should recover when it comes back.
                     print(f"[WARN] relay '{new_name}' (sid={sid}) error: {e}", flush=True)
 
-            time.sleep(0.001)
+            # Back off only after a real silence (not the normal gap between muselsl chunks);
+            # back to full rate as soon as data flows
+            now = time.monotonic()
+            if forwarded:
+                last_data = now
+                poll_sec = POLL_SEC
+            elif now - last_data >= IDLE_AFTER_SEC:
+                poll_sec = min(poll_sec * 2, IDLE_POLL_SEC)
+            time.sleep(poll_sec)
 
     except KeyboardInterrupt:
         print("\nStopping bridge.", flush=True)
@@ -10,11 +10,11 @@ muselsl list
 
 echo "Starting Muse streams..."
 
-# Start both streams in background
-muselsl stream --name Muse-FDCA &
+# Start both streams in background (EEG + PPG, accelerometer, gyroscope)
+muselsl stream --name Muse-FDCA --ppg --acc --gyro &
 PID1=$!
 
-muselsl stream --name Muse-07D2 &
+muselsl stream --name Muse-07D2 --ppg --acc --gyro &
 PID2=$!
 
 echo "Starting relay script..."
@@ -0,0 +1,130 @@
+"""
+signal_quality.py
+
+Vectorized artifact / signal-quality gate used by game.py on every pulled chunk,
+before values can reach the game.
+
+Thresholds are relative to each channel's own running statistics (median and
+MAD over the last QUALITY_WINDOW samples), so the same defaults work for raw
+EEG in microvolts and for band-power or theta/beta ratio streams.
+"""
+
+import time
+
+import numpy as np
+
+
+QUALITY_Z_MAX = 5.0         # robust z-score above this => sample dropped (blinks, jaw clenches)
+QUALITY_VAR_RATIO = 4.0     # chunk std above this many robust sigmas => whole chunk dropped
+QUALITY_FLAT_STD = 1e-9     # std over the last QUALITY_FLAT_SAMPLES below this => flatline (electrode dropout)
+QUALITY_FLAT_SAMPLES = 16   # samples checked for a flatline
+QUALITY_WINDOW = 256        # samples of history for the running median / MAD
+QUALITY_MIN_HISTORY = 16    # samples needed before the z-score / variance checks kick in
+QUALITY_SMOOTHING = 0.2     # EMA weight of the newest chunk in the displayed quality %
+QUALITY_BUDGET_MS = 2.0     # per-chunk compute budget; overruns are counted and shown
+
+# MAD -> standard deviation for normally distributed data
+_MAD_TO_SIGMA = 1.4826
+_EPS = 1e-12
+
+
+class SignalQualityGate:
+    """
+    Vectorized artifact rejection for one player's stream, run chunk by chunk.
+
+    - non-finite: samples with NaN/inf in any channel are dropped
+    - spike:      samples whose robust z-score |x - median| / (1.4826 * MAD)
+                  exceeds z_max in any channel are dropped
+    - variance:   if any channel's std over the chunk's remaining samples exceeds
+                  var_ratio robust sigmas, the whole chunk is dropped (needs >= 2)
+    - flatline:   if any channel's std over the last flat_samples is below
+                  flat_std, the whole chunk is dropped
+
+    z_max, var_ratio and flat_std may be a scalar or one value per channel.
+    Flat chunks are kept out of the median/MAD history so the baseline survives
+    an electrode dropout; everything else finite goes in, so a lasting level
+    change becomes the new baseline once it fills half the window.
+    The time spent per chunk is measured against budget_ms.
+    """
+
+    def __init__(
+        self,
+        channel_count,
+        z_max=QUALITY_Z_MAX,
+        var_ratio=QUALITY_VAR_RATIO,
+        flat_std=QUALITY_FLAT_STD,
+        flat_samples=QUALITY_FLAT_SAMPLES,
+        window=QUALITY_WINDOW,
+        min_history=QUALITY_MIN_HISTORY,
+        budget_ms=QUALITY_BUDGET_MS,
+    ):
+        shape = (channel_count,)
+        self.z_max = np.broadcast_to(np.asarray(z_max, dtype=np.float64), shape)
+        self.var_ratio = np.broadcast_to(np.asarray(var_ratio, dtype=np.float64), shape)
+        self.flat_std = np.broadcast_to(np.asarray(flat_std, dtype=np.float64), shape)
+        self.flat_samples = flat_samples
+        self.window = window
+        self.min_history = min_history
+        self.budget_ms = budget_ms
+
+        self._hist = np.empty((0, channel_count))
+        self._recent = np.empty((0, channel_count))
+
+        # Reported stats
+        self.quality = 1.0      # smoothed fraction of samples kept
+        self.reason = "ok"      # why the last chunk lost samples
+        self.avg_ms = 0.0
+        self.max_ms = 0.0
+        self.over_budget = 0
+
+    def process(self, chunk):
+        """Return only the good rows of a (samples, channels) chunk."""
+        t0 = time.perf_counter()
+
+        chunk = np.asarray(chunk, dtype=np.float64)
+        ok = np.isfinite(chunk).all(axis=1)
+        finite = chunk[ok]
+        reason = "ok" if ok.all() else "non-finite"
+
+        self._recent = np.concatenate([self._recent, finite])[-self.flat_samples:]
+        if len(self._recent) >= self.flat_samples and (self._recent.std(axis=0) < self.flat_std).any():
+            ok[:] = False
+            reason = "flatline"
+        else:
+            if len(self._hist) >= self.min_history:
+                med = np.median(self._hist, axis=0)
+                sigma = np.maximum(_MAD_TO_SIGMA * np.median(np.abs(self._hist - med), axis=0), _EPS)
+
+                with np.errstate(invalid="ignore"):
+                    spike = (np.abs(chunk - med) / sigma > self.z_max).any(axis=1)
+                if spike.any():
+                    ok &= ~spike
+                    reason = "spike"
+
+                # Spread of what's left after spike removal, so one blink doesn't cost the whole chunk
+                kept = chunk[ok]
+                if len(kept) >= 2 and (kept.std(axis=0) > self.var_ratio * sigma).any():
+                    ok[:] = False
+                    reason = "variance"
+
+            self._hist = np.concatenate([self._hist, finite])[-self.window:]
+
+        self.quality += QUALITY_SMOOTHING * (ok.mean() - self.quality)
+        self.reason = reason
+
+        dur_ms = (time.perf_counter() - t0) * 1000.0
+        self.avg_ms += QUALITY_SMOOTHING * (dur_ms - self.avg_ms)
+        self.max_ms = max(self.max_ms, dur_ms)
+        if dur_ms > self.budget_ms:
+            self.over_budget += 1
+
+        return chunk[ok]
+
+    def quality_text(self):
+        return f"{self.quality * 100:.0f}% ({self.reason})"
+
+    def budget_text(self):
+        text = f"{self.avg_ms:.2f}/{self.max_ms:.2f} ms of {self.budget_ms:g}"
+        if self.over_budget:
+            text += f", {self.over_budget} over"
+        return text
@@ -0,0 +1,80 @@
+import numpy as np
+import pytest
+
+from band_features import band_layout, reduce_features
+
+
+class _Channel:
+    def __init__(self, labels, i):
+        self.labels, self.i = labels, i
+
+    def empty(self):
+        return self.i >= len(self.labels)
+
+    def child_value(self, name):
+        return self.labels[self.i]
+
+    def next_sibling(self):
+        return _Channel(self.labels, self.i + 1)
+
+
+class _Desc:
+    def __init__(self, labels):
+        self.labels = labels
+
+    def child(self, name):
+        return self if name == "channels" else _Channel(self.labels, 0)
+
+
+class _Info:
+    def __init__(self, n, labels=()):
+        self.n, self.labels = n, list(labels)
+
+    def channel_count(self):
+        return self.n
+
+    def desc(self):
+        return _Desc(self.labels)
+
+
+def test_single_channel_has_no_layout():
+    assert band_layout(_Info(1)) is None
+
+
+def test_labels_are_trusted_without_all_bands():
+    labels = ["TP9_theta", "TP9_beta", "AF7_theta", "AF7_beta", "AF8_theta", "AF8_beta"]
+    layout = band_layout(_Info(6, labels))
+    assert set(layout) == {"theta", "beta"}
+    assert layout["theta"].tolist() == [0, 2, 4]
+    assert layout["beta"].tolist() == [1, 3, 5]
+
+    layout = band_layout(_Info(4, labels[:4]))
+    assert layout["theta"].tolist() == [0, 2]
+    assert layout["beta"].tolist() == [1, 3]
+
+
+def test_labels_missing_needed_band_raise():
+    with pytest.raises(ValueError, match="beta"):
+        band_layout(_Info(2, ["TP9_theta", "TP9_alpha"]))
+    # ... but that stream is fine for a feature that doesn't need beta
+    assert set(band_layout(_Info(2, ["TP9_theta", "TP9_alpha"]), feature="theta_alpha")) == {"theta", "alpha"}
+
+
+def test_unlabelled_falls_back_to_interleave():
+    layout = band_layout(_Info(6, [""] * 6))
+    assert layout["theta"].tolist() == [0, 3]
+    assert layout["alpha"].tolist() == [1, 4]
+    assert layout["beta"].tolist() == [2, 5]
+
+    with pytest.raises(ValueError):
+        band_layout(_Info(4))
+
+
+def test_reduce_features_across_players():
+    layout = band_layout(_Info(4, ["TP9_theta", "TP9_beta", "AF7_theta", "AF7_beta"]))
+    samples = np.array([
+        [2.0, 1.0, 4.0, 1.0],   # theta mean 3, beta mean 1
+        [1.0, 2.0, 1.0, 2.0],   # theta mean 1, beta mean 2
+    ])
+    np.testing.assert_allclose(reduce_features(samples, layout), [3.0, 0.5])
+    np.testing.assert_allclose(reduce_features(samples, None), [2.0, 1.0])
@@ -0,0 +1,47 @@
+import numpy as np
+
+from signal_quality import SignalQualityGate
+
+
+def test_ratio_spike_is_dropped():
+    rng = np.random.default_rng(0)
+    gate = SignalQualityGate(1)
+    for v in 1.0 + 0.1 * rng.standard_normal(64):
+        assert len(gate.process([[v]])) == 1
+
+    assert len(gate.process([[25.0]])) == 0
+    assert gate.reason == "spike"
+    assert len(gate.process([[1.05]])) == 1
+
+
+def test_eeg_blink_is_dropped():
+    rng = np.random.default_rng(1)
+    gate = SignalQualityGate(5)
+    for _ in range(20):
+        assert len(gate.process(20.0 * rng.standard_normal((12, 5)))) == 12
+
+    chunk = 20.0 * rng.standard_normal((12, 5))
+    chunk[4:7, 1] += 250.0
+    good = gate.process(chunk)
+    assert len(good) == 9
+    assert np.abs(good[:, 1]).max() < 100.0
+
+
+def test_flatline_is_dropped_and_recovers():
+    rng = np.random.default_rng(2)
+    gate = SignalQualityGate(2)
+    gate.process(rng.standard_normal((64, 2)))
+
+    chunk = rng.standard_normal((32, 2))
+    chunk[:, 0] = 0.0
+    assert len(gate.process(chunk)) == 0
+    assert gate.reason == "flatline"
+
+    assert len(gate.process(rng.standard_normal((32, 2)))) > 0
+
+
+def test_non_finite_is_dropped():
+    gate = SignalQualityGate(2)
+    chunk = np.ones((4, 2)) + 0.01 * np.arange(8).reshape(4, 2)
+    chunk[2, 1] = np.nan
+    assert len(gate.process(chunk)) == 3